@@ -3,13 +3,139 @@
 Build script to create a DXT package for Tides
 """
 
-import shutil
+import hashlib
+import os
 import subprocess
 import sys
+import sysconfig
 import tempfile
 import zipfile
+import zlib
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Pinned dependency closure installed into server/lib
+LOCK_FILE = "requirements-dxt.txt"
+
+# Already-compressed assets gain nothing from deflate. Native extensions
+# (.so/.pyd/.dylib) still shrink by roughly half, so they stay deflated.
+STORED_SUFFIXES = {".png", ".woff2", ".zip", ".whl", ".gz"}
+COMPRESS_LEVEL = 3
+
+
+def wheel_cache_dir(lock_path: Path) -> Path:
+    """Return the wheelhouse for this lockfile, Python version and platform"""
+    cache_root = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    key = hashlib.sha256(lock_path.read_bytes())
+    key.update(sys.implementation.cache_tag.encode())
+    key.update(sysconfig.get_platform().encode())
+    return cache_root / "tides-dxt" / "wheels" / key.hexdigest()[:16]
+
+
+def install_dependencies(lib_dir: Path, lock_path: Path) -> None:
+    """Install pinned dependencies from a persistent wheel cache"""
+    wheelhouse = wheel_cache_dir(lock_path)
+    stamp = wheelhouse / ".complete"
+    pip = [sys.executable, "-m", "pip"]
+
+    # Populate the cache once; later builds skip resolution and the network
+    if not stamp.exists():
+        print(f"⬇️  Downloading wheels to cache: {wheelhouse}")
+        subprocess.run(
+            [
+                *pip,
+                "download",
+                "--no-deps",
+                "--only-binary=:all:",
+                "--dest",
+                str(wheelhouse),
+                "--requirement",
+                str(lock_path),
+            ],
+            check=True,
+        )
+        stamp.touch()
+
+    subprocess.run(
+        [
+            *pip,
+            "install",
+            "--no-deps",
+            "--no-index",
+            # Bundled .pyc files would only match the build interpreter
+            "--no-compile",
+            "--only-binary=:all:",
+            "--find-links",
+            str(wheelhouse),
+            "--target",
+            str(lib_dir),
+            "--requirement",
+            str(lock_path),
+        ],
+        check=True,
+    )
+
+
+def walk_files(root: str, prefix: str = "") -> Iterator[tuple[str, str]]:
+    """Yield (path, arc_name) for every file below root, skipping bytecode"""
+    # DirEntry caches type information, avoiding a stat per entry
+    with os.scandir(root) as it:
+        for entry in it:
+            arc_name = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                # Local .pyc files only match the developer's interpreter
+                if entry.name != "__pycache__":
+                    yield from walk_files(entry.path, arc_name + "/")
+            elif entry.is_file() and not entry.name.endswith(".pyc"):
+                yield entry.path, arc_name
+
+
+def read_file(
+    file_path: str, arc_name: str
+) -> tuple[zipfile.ZipInfo, bytes, tuple[bytes, bool]]:
+    """Read a file into a zip entry, its data and a content key for dedup"""
+    zinfo = zipfile.ZipInfo.from_file(file_path, arc_name)
+    with open(file_path, "rb") as f:
+        data = f.read()
+    zinfo.file_size = len(data)
+    zinfo.CRC = zlib.crc32(data)
+
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    stored = os.path.splitext(arc_name)[1] in STORED_SUFFIXES
+    return zinfo, data, (digest, stored)
+
+
+def compress_data(data: bytes, stored: bool) -> tuple[int, bytes]:
+    """Compress file contents, returning the zip method and payload"""
+    if stored:
+        return zipfile.ZIP_STORED, data
+
+    # Raw deflate stream (no zlib header), as stored inside zip archives
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    payload = compressor.compress(data) + compressor.flush()
+
+    if len(payload) < len(data):
+        return zipfile.ZIP_DEFLATED, payload
+    # Deflate did not help; keep the original bytes
+    return zipfile.ZIP_STORED, data
+
+
+class PrecompressedZipFile(zipfile.ZipFile):
+    """ZipFile that accepts entries compressed ahead of time"""
+
+    def write_compressed(self, zinfo: zipfile.ZipInfo, payload: bytes) -> None:
+        """Append an entry whose payload is already compressed"""
+        with self._lock:
+            self._writecheck(zinfo)
+            self._didModify = True
+            zinfo.header_offset = self.fp.tell()
+            self.fp.write(zinfo.FileHeader())
+            self.fp.write(payload)
+            self.filelist.append(zinfo)
+            self.NameToInfo[zinfo.filename] = zinfo
+            self.start_dir = self.fp.tell()
+
 
 def build_dxt():
     """Build the DXT package"""
@@ -18,54 +144,53 @@ def build_dxt():
     # Get the directory containing this script
     root_dir = Path(__file__).parent
 
-    # Create a temporary directory for building
+    # Only the installed dependencies need a temporary directory
     with tempfile.TemporaryDirectory() as temp_dir:
-        build_dir = Path(temp_dir) / "tides-dxt"
-        build_dir.mkdir()
-
-        # Copy server files
-        print("📁 Copying server files...")
-        shutil.copytree(root_dir / "server", build_dir / "server")
-
-        # Copy manifest
-        shutil.copy(root_dir / "manifest.json", build_dir / "manifest.json")
-
-        # Copy icon if it exists
-        icon_path = root_dir / "icon.png"
-        if icon_path.exists():
-            shutil.copy(icon_path, build_dir / "icon.png")
-
         # Create lib directory and install dependencies
         print("📦 Installing dependencies...")
-        lib_dir = build_dir / "server" / "lib"
+        lib_dir = Path(temp_dir) / "lib"
         lib_dir.mkdir()
 
         # Install dependencies to lib directory
-        subprocess.run(
-            [
-                sys.executable,
-                "-m",
-                "pip",
-                "install",
-                "--target",
-                str(lib_dir),
-                "mcp>=1.0.0",
-                "pydantic>=2.0.0",
-                "python-dotenv>=1.0.0",
-            ],
-            check=True,
-        )
+        install_dependencies(lib_dir, root_dir / LOCK_FILE)
 
         # Create the DXT file
         dxt_path = root_dir / "tides.dxt"
         print(f"📦 Creating DXT package: {dxt_path}")
 
-        with zipfile.ZipFile(dxt_path, "w", zipfile.ZIP_DEFLATED) as dxt:
-            # Add all files from build directory
-            for file_path in build_dir.rglob("*"):
-                if file_path.is_file():
-                    arc_name = str(file_path.relative_to(build_dir))
-                    dxt.write(file_path, arc_name)
+        # Server files, manifest and icon are read straight from the source tree
+        files = [
+            *walk_files(str(root_dir / "server"), "server/"),
+            (str(root_dir / "manifest.json"), "manifest.json"),
+        ]
+        icon_path = root_dir / "icon.png"
+        if icon_path.exists():
+            files.append((str(icon_path), "icon.png"))
+        files.extend(walk_files(str(lib_dir), "server/lib/"))
+
+        # Read and compress in parallel (zlib releases the GIL), write in order
+        with (
+            ThreadPoolExecutor() as pool,
+            PrecompressedZipFile(dxt_path, "w", zipfile.ZIP_DEFLATED) as dxt,
+        ):
+            entries = list(pool.map(lambda f: read_file(*f), files))
+
+            # Identical contents (empty __init__.py, licenses) compress once
+            unique = {key: data for _, data, key in entries}
+            compressed = dict(
+                zip(
+                    unique,
+                    pool.map(lambda key: compress_data(unique[key], key[1]), unique),
+                    strict=True,
+                )
+            )
+
+            for zinfo, _, key in entries:
+                zinfo.compress_type, payload = compressed[key]
+                zinfo.compress_size = len(payload)
+                dxt.write_compressed(zinfo, payload)
+
+            print(f"🗜️  Compressed {len(unique)} unique of {len(entries)} files")
 
         # Get file size
         size_mb = dxt_path.stat().st_size / (1024 * 1024)
@@ -8,13 +8,16 @@ Helps create sustainable productivity cycles through tidal flows.
 
 import asyncio
 import logging
+import os
+import signal
 import sys
 
 import mcp.server.stdio
 from mcp import types
 from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
-from tools.tide_tools import tide_handlers, tide_tools
+from pydantic_core import to_json
+from tools.tide_tools import get_tide_storage, tide_handlers, tide_tools
 
 # Configure logging
 logging.basicConfig(
@@ -45,7 +48,8 @@ async def handle_call_tool(name: str, arguments: dict) -> list[types.TextContent
 
     result = await tide_handlers[name](arguments)
 
-    return [types.TextContent(type="text", text=str(result))]
+    # Serialize in pydantic-core; str() would produce a Python repr, not JSON
+    return [types.TextContent(type="text", text=to_json(result).decode())]
 
 
 async def main():
@@ -62,7 +66,39 @@ async def main():
         ),
     )
 
+    # The MCP client stops the server with SIGTERM, whose default action
+    # would skip flushing buffered saves
+    loop = asyncio.get_running_loop()
+    terminated = asyncio.Event()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, terminated.set)
+    except NotImplementedError:
+        pass  # Windows event loops do not support signal handlers
+
     # Run the server
+    serve = asyncio.create_task(run_server(options))
+    stop = asyncio.create_task(terminated.wait())
+    try:
+        await asyncio.wait({serve, stop}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        # Write any buffered tide saves before exiting; skip creating the
+        # storage if no tool ever used it
+        if get_tide_storage.cache_info().currsize:
+            await get_tide_storage().flush()
+
+    if terminated.is_set():
+        # The stdin reader blocks in a thread and cannot be cancelled, so
+        # finish with the signal's default action
+        logger.info("🌊 Stopping Tides MCP Server...")
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    stop.cancel()
+    await serve
+
+
+async def run_server(options: InitializationOptions) -> None:
+    """Serve MCP requests over stdio until the client disconnects"""
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         await server.run(
             read_stream,
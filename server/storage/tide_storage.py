@@ -2,12 +2,16 @@
 Storage implementation for tidal workflows
 """
 
-import json
+import asyncio
+import logging
+import os
 import random
 import time
 from datetime import datetime, timedelta
+from operator import attrgetter
 from pathlib import Path
 from typing import Literal
+from uuid import uuid4
 
 from pydantic import BaseModel
 
@@ -15,6 +19,18 @@ FlowType = Literal["daily", "weekly", "project", "seasonal"]
 TideStatus = Literal["active", "paused", "completed"]
 FlowIntensity = Literal["gentle", "moderate", "strong"]
 
+# (st_mtime_ns, st_size) of a file when it was last parsed
+FileStamp = tuple[int, int]
+# Stamps of a tide's metadata file and of its flow log, if any
+TideStamp = tuple[FileStamp, FileStamp | None]
+
+FLOWS_SUFFIX = ".flows.jsonl"
+
+logger = logging.getLogger(__name__)
+
+# Buffered saves that force a flush before the interval elapses
+MAX_PENDING_SAVES = 100
+
 
 class FlowEntry(BaseModel):
     """Flow entry in tide history"""
@@ -57,8 +73,22 @@ class ListTidesFilter(BaseModel):
 class TideStorage:
     """Storage for tidal workflows"""
 
-    def __init__(self, data_dir: str):
+    def __init__(self, data_dir: str, flush_interval: float | None = None):
         self.data_dir = Path(data_dir)
+        # Parsed tides keyed by tide ID; reused while the file stamp matches
+        self._cache: dict[str, tuple[TideStamp, TideData | None]] = {}
+        # With a flush interval (seconds), saves are buffered and written in
+        # batches; None writes every save immediately
+        self.flush_interval = flush_interval
+        self._pending: dict[str, TideData] = {}
+        # Buffered tides whose only changes are new flows, mapped to how many
+        # flows to append; tides missing here get a full rewrite
+        self._pending_flows: dict[str, int] = {}
+        self._flush_task: asyncio.Task[None] | None = None
+        # Disk writes run in worker threads; the lock keeps them in call order
+        self._write_lock = asyncio.Lock()
+        # Serializes read-modify-write updates so none is based on stale data
+        self._update_lock = asyncio.Lock()
         try:
             self.data_dir.mkdir(parents=True, exist_ok=True)
         except PermissionError as e:
@@ -97,19 +127,51 @@ class TideStorage:
             flow_history=[],
         )
 
-        await self._save_tide(tide)
+        # New tides are written immediately even when saves are buffered
+        await self._save_tide(tide, durable=True)
         return tide
 
     async def get_tide(self, tide_id: str) -> TideData | None:
         """Get a tide by ID"""
+        pending = self._pending.get(tide_id)
+        if pending:
+            return pending.model_copy(deep=True)
+
         file_path = self.data_dir / f"{tide_id}.json"
+        try:
+            stamp = self._tide_stamp(tide_id)
+        except FileNotFoundError:
+            self._cache.pop(tide_id, None)
+            return None
 
+        cached = self._cache.get(tide_id)
+        if cached and cached[0] == stamp:
+            tide = cached[1]
+        else:
+            tide = await asyncio.to_thread(self._read_tide_file, file_path)
+            self._cache[tide_id] = (stamp, tide)
+
+        # Callers modify the returned tide, so never hand out the cached one
+        return tide.model_copy(deep=True) if tide else None
+
+    def peek_tide(self, tide_id: str) -> TideData | None:
+        """Return a tide's cached state without reading its files
+
+        Only a stat confirms the cache is current; None means the caller
+        should fall back to get_tide. The result is shared with the cache, so
+        callers must treat it as read-only.
+        """
+        pending = self._pending.get(tide_id)
+        if pending:
+            return pending
+        cached = self._cache.get(tide_id)
+        if not cached:
+            return None
         try:
-            with open(file_path) as f:
-                data = json.load(f)
-                return TideData(**data)
-        except (FileNotFoundError, json.JSONDecodeError):
+            stamp = self._tide_stamp(tide_id)
+        except FileNotFoundError:
             return None
+        return cached[1] if cached[0] == stamp else None
 
     async def list_tides(
         self, filter_data: ListTidesFilter | None = None
@@ -118,61 +180,146 @@ class TideStorage:
         if filter_data is None:
             filter_data = ListTidesFilter()
 
+        entries = []
+        flow_stamps: dict[str, FileStamp] = {}
+        with os.scandir(self.data_dir) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                if entry.name.endswith(FLOWS_SUFFIX):
+                    tide_id = entry.name.removesuffix(FLOWS_SUFFIX)
+                    flow_stamps[tide_id] = self._stamp(entry.stat())
+                elif entry.name.endswith(".json"):
+                    entries.append(entry)
+
+        # Only re-parse tides whose files changed since they were last read
+        stale = []
+        for entry in entries:
+            tide_id = entry.name.removesuffix(".json")
+            stamp = (self._stamp(entry.stat()), flow_stamps.get(tide_id))
+            cached = self._cache.get(tide_id)
+            if not cached or cached[0] != stamp:
+                stale.append((tide_id, entry.path, stamp))
+
+        # Read files concurrently so per-file disk latency overlaps
+        loaded = await asyncio.gather(
+            *(
+                asyncio.to_thread(self._read_tide_file, Path(path))
+                for _, path, _ in stale
+            )
+        )
+        for (tide_id, _, stamp), tide in zip(stale, loaded, strict=True):
+            self._cache[tide_id] = (stamp, tide)
+
+        # Forget tides whose files have been removed
+        present = {entry.name.removesuffix(".json") for entry in entries}
+        for tide_id in self._cache.keys() - present:
+            del self._cache[tide_id]
+
+        # Buffered saves are newer than anything on disk
+        current = {tide_id: tide for tide_id, (_, tide) in self._cache.items()}
+        current.update(self._pending)
+
+        # Cached tides are shared; callers must treat them as read-only
         tides = []
+        for tide in current.values():
+            # Skip invalid files
+            if tide is None:
+                continue
 
-        try:
-            for file_path in self.data_dir.glob("*.json"):
-                if file_path.is_file():
-                    try:
-                        with open(file_path) as f:
-                            data = json.load(f)
-                            tide = TideData(**data)
-
-                            # Apply filters
-                            if (
-                                filter_data.flow_type
-                                and tide.flow_type != filter_data.flow_type
-                            ):
-                                continue
-
-                            if filter_data.active_only and tide.status != "active":
-                                continue
-
-                            tides.append(tide)
-                    except (json.JSONDecodeError, ValueError):
-                        # Skip invalid files
-                        continue
-
-            # Sort by created_at descending
-            tides.sort(key=lambda t: datetime.fromisoformat(t.created_at), reverse=True)
-            return tides
+            # Apply filters
+            if filter_data.flow_type and tide.flow_type != filter_data.flow_type:
+                continue
 
-        except Exception:
-            return []
+            if filter_data.active_only and tide.status != "active":
+                continue
 
-    async def update_tide(self, tide_id: str, updates: dict) -> TideData | None:
-        """Update a tide with partial data"""
-        tide = await self.get_tide(tide_id)
-        if not tide:
-            return None
+            tides.append(tide)
 
-        # Create updated tide, ensuring ID can't be changed
-        tide_dict = tide.model_dump()
-        tide_dict.update(updates)
-        tide_dict["id"] = tide_id  # Ensure ID can't be changed
+        # Sort by created_at descending; naive ISO 8601 strings sort
+        # chronologically, so no parsing is needed
+        tides.sort(key=attrgetter("created_at"), reverse=True)
+        return tides
 
-        updated_tide = TideData(**tide_dict)
-        await self._save_tide(updated_tide)
-        return updated_tide
+    async def update_tide(self, tide_id: str, updates: dict) -> TideData | None:
+        """Update a tide with partial data"""
+        return await self.apply_updates(tide_id, updates)
+
+    async def apply_updates(
+        self,
+        tide_id: str,
+        updates: dict,
+        append_flow: FlowEntry | None = None,
+        last_flow_notes: str | None = None,
+    ) -> TideData | None:
+        """Update a tide and optionally record a flow with a single save
+
+        last_flow_notes are set on the tide's latest flow as read under the
+        update lock, or saved on a new completion flow if it has none.
+        """
+        async with self._update_lock:
+            tide = await self.get_tide(tide_id)
+            if not tide:
+                return None
+
+            # Create updated tide, ensuring ID can't be changed
+            tide_dict = tide.model_dump()
+            tide_dict.update(updates)
+            tide_dict["id"] = tide_id  # Ensure ID can't be changed
+
+            updated_tide = TideData(**tide_dict)
+            if last_flow_notes is not None:
+                if updated_tide.flow_history:
+                    updated_tide.flow_history[-1].notes = last_flow_notes
+                elif append_flow is None:
+                    append_flow = FlowEntry(
+                        timestamp=updated_tide.last_flow or datetime.now().isoformat(),
+                        intensity="gentle",
+                        duration=0,
+                        notes=last_flow_notes,
+                    )
+            if append_flow is not None:
+                self._record_flow(updated_tide, append_flow)
+
+            # Status changes are written immediately even when saves are buffered
+            await self._save_tide(updated_tide, durable="status" in updates)
+            return updated_tide
 
     async def add_flow_to_tide(
         self, tide_id: str, flow_entry: FlowEntry
     ) -> TideData | None:
         """Add a flow entry to a tide's history"""
-        tide = await self.get_tide(tide_id)
-        if not tide:
-            return None
-
+        async with self._update_lock:
+            tide = await self.get_tide(tide_id)
+            if not tide:
+                return None
+
+            flows_path = self._flows_path(tide_id)
+            # History still inline in a legacy file moves to the log on full
+            # save; flows already buffered for appending mean the log is in use
+            migrate = (
+                bool(tide.flow_history)
+                and tide_id not in self._pending_flows
+                and not flows_path.exists()
+            )
+
+            self._record_flow(tide, flow_entry)
+
+            if migrate:
+                await self._save_tide(tide)
+            elif self.flush_interval is not None:
+                await self._buffer_flow(tide)
+            else:
+                async with self._write_lock:
+                    stamp = await asyncio.to_thread(
+                        self._append_flows, tide, [flow_entry]
+                    )
+                    self._refresh_cache(tide, stamp)
+            return tide
+
+    @staticmethod
+    def _record_flow(tide: TideData, flow_entry: FlowEntry) -> None:
+        """Add a flow to a tide's history and reschedule its next flow"""
         # Add flow to history
         tide.flow_history.append(flow_entry)
         tide.last_flow = flow_entry.timestamp
@@ -186,11 +333,188 @@ class TideStorage:
         elif tide.flow_type == "seasonal":
             tide.next_flow = (flow_time + timedelta(days=90)).isoformat()
 
-        await self._save_tide(tide)
+    def _flows_path(self, tide_id: str) -> Path:
+        """Path of the append-only flow log for a tide"""
+        return self.data_dir / f"{tide_id}{FLOWS_SUFFIX}"
+
+    def _tide_stamp(self, tide_id: str) -> TideStamp:
+        """Identify the current version of a tide's metadata file and flow log"""
+        return (
+            self._stamp((self.data_dir / f"{tide_id}.json").stat()),
+            self._stamp_if_exists(self._flows_path(tide_id)),
+        )
+
+    @staticmethod
+    def _stamp(stat: os.stat_result) -> FileStamp:
+        """Identify a file version by modification time and size"""
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @classmethod
+    def _stamp_if_exists(cls, file_path: Path) -> FileStamp | None:
+        """Stamp a file, or None if it does not exist"""
+        try:
+            return cls._stamp(file_path.stat())
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _read_tide_file(file_path: Path) -> TideData | None:
+        """Load a tide file, returning None if it is missing or invalid"""
+        try:
+            # Validate straight from JSON bytes without an intermediate dict
+            with open(file_path, "rb") as f:
+                tide = TideData.model_validate_json(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+        # When a flow log exists it holds the complete history
+        flows_path = file_path.with_name(f"{file_path.stem}{FLOWS_SUFFIX}")
+        try:
+            with open(flows_path, "rb") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return tide
+
+        tide.flow_history = []
+        for line in lines:
+            try:
+                tide.flow_history.append(FlowEntry.model_validate_json(line))
+            except ValueError:
+                # Skip blank lines and a torn final append
+                continue
         return tide
 
-    async def _save_tide(self, tide: TideData) -> None:
-        """Save a tide to storage"""
+    def _append_flows(self, tide: TideData, flows: list[FlowEntry]) -> TideStamp:
+        """Append lines to the flow log, then patch the small metadata file"""
+        data = b"".join(flow.model_dump_json().encode() + b"\n" for flow in flows)
+        with open(self._flows_path(tide.id), "a+b") as f:
+            # Terminate a torn final line so the new records are not glued to it
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+        self._write_metadata(tide)
+        return self._tide_stamp(tide.id)
+
+    def _write_metadata(self, tide: TideData) -> None:
+        """Write a tide's metadata file; its history lives in the flow log"""
         file_path = self.data_dir / f"{tide.id}.json"
-        with open(file_path, "w") as f:
-            json.dump(tide.model_dump(), f, indent=2)
+        # Serialize straight from the model in pydantic-core; leaving out
+        # flow_history keeps hand edits from going to a field that is ignored
+        data = tide.model_dump_json(indent=2, exclude={"flow_history"})
+        self._atomic_write(file_path, data.encode())
+
+    @staticmethod
+    def _atomic_write(file_path: Path, data: bytes) -> None:
+        """Replace a file so readers see either the old or the new contents"""
+        tmp_path = file_path.with_name(f"{file_path.name}.{uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _refresh_cache(self, tide: TideData, stamp: TideStamp) -> None:
+        """Record a just-written tide so the next read skips the disk
+
+        Call this on the event loop, never from a worker thread: list_tides
+        iterates the cache between awaits.
+        """
+        self._cache[tide.id] = (stamp, tide.model_copy(deep=True))
+
+    async def flush(self) -> None:
+        """Write all buffered saves to disk"""
+        self._cancel_scheduled_flush()
+        while True:
+            async with self._write_lock:
+                if not self._pending:
+                    return
+                tide_id, tide = next(iter(self._pending.items()))
+                # Flows buffered while writing land in a later full rewrite
+                appended = self._pending_flows.pop(tide_id, None)
+                if appended is None:
+                    stamp = await asyncio.to_thread(self._write_tide, tide)
+                else:
+                    stamp = await asyncio.to_thread(
+                        self._append_flows, tide, tide.flow_history[-appended:]
+                    )
+                self._refresh_cache(tide, stamp)
+                # A newer save may have replaced this entry while writing
+                if self._pending.get(tide_id) is tide:
+                    del self._pending[tide_id]
+
+    def _cancel_scheduled_flush(self) -> None:
+        """Drop a flush still waiting for its interval; it has nothing to write"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+    async def _flush_later(self) -> None:
+        """Flush buffered saves once the flush interval has elapsed"""
+        assert self.flush_interval is not None
+        await asyncio.sleep(self.flush_interval)
+        # Detach so the flush below does not cancel its own task
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            # Nobody awaits this task, so report the failure and try again
+            logger.exception("Failed to flush buffered tide saves")
+            if self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _save_tide(self, tide: TideData, durable: bool = False) -> None:
+        """Save a tide to storage, buffering it when group commit is enabled"""
+        if self.flush_interval is None or durable:
+            async with self._write_lock:
+                buffered = self._pending.get(tide.id)
+                stamp = await asyncio.to_thread(self._write_tide, tide)
+                self._refresh_cache(tide, stamp)
+                # Saves buffered before this one are superseded; later ones
+                # keep their place but can no longer be appended
+                if self._pending.get(tide.id) is buffered:
+                    self._pending.pop(tide.id, None)
+                self._pending_flows.pop(tide.id, None)
+            if not self._pending:
+                self._cancel_scheduled_flush()
+            return
+
+        self._pending[tide.id] = tide.model_copy(deep=True)
+        self._pending_flows.pop(tide.id, None)
+        await self._flush_soon()
+
+    async def _buffer_flow(self, tide: TideData) -> None:
+        """Buffer a tide whose only change is one new flow at the end"""
+        # A buffered full rewrite already covers the new flow
+        if tide.id not in self._pending or tide.id in self._pending_flows:
+            self._pending_flows[tide.id] = self._pending_flows.get(tide.id, 0) + 1
+        self._pending[tide.id] = tide.model_copy(deep=True)
+        await self._flush_soon()
+
+    async def _flush_soon(self) -> None:
+        """Schedule a flush, or flush now if too many saves are buffered"""
+        if len(self._pending) >= MAX_PENDING_SAVES:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    def _write_tide(self, tide: TideData) -> TideStamp:
+        """Write a tide to disk, rewriting its metadata and flow log"""
+        flows_path = self._flows_path(tide.id)
+        # Write the log first so a crash never leaves history only half-moved
+        if tide.flow_history:
+            self._atomic_write(
+                flows_path,
+                b"".join(
+                    flow.model_dump_json().encode() + b"\n"
+                    for flow in tide.flow_history
+                ),
+            )
+        else:
+            flows_path.unlink(missing_ok=True)
+
+        self._write_metadata(tide)
+        return self._tide_stamp(tide.id)
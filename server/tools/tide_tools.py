@@ -2,6 +2,7 @@
 Tidal workflow management tools
 """
 
+import functools
 import logging
 import os
 from datetime import datetime, timedelta
@@ -10,46 +11,72 @@ from typing import Any, Literal
 from mcp import types
 from pydantic import BaseModel, Field
 
-# Use absolute import when running as a module, relative import otherwise
+# Use relative import inside the server package, absolute import when the
+# server directory itself is on sys.path (DXT entry point). Trying the
+# relative form first keeps tests from loading the storage module twice.
 try:
-    from storage.tide_storage import (
+    from ..storage.tide_storage import (
         CreateTideInput,
         FlowEntry,
         ListTidesFilter,
+        TideData,
         TideStorage,
     )
 except ImportError:
-    from ..storage.tide_storage import (
+    from storage.tide_storage import (  # type: ignore[no-redef]
         CreateTideInput,
         FlowEntry,
         ListTidesFilter,
+        TideData,
         TideStorage,
     )
 
 logger = logging.getLogger(__name__)
 
-# Initialize storage (use mounted volume in Docker or local directory for development)
 
-storage_path = os.getenv("TIDES_STORAGE_PATH", "./tides_data")
-# Expand user home directory if present
-if storage_path.startswith("~/"):
-    storage_path = os.path.expanduser(storage_path)
-elif "${HOME}" in storage_path:
-    storage_path = storage_path.replace("${HOME}", os.path.expanduser("~"))
+@functools.lru_cache(maxsize=1)
+def _resolve_storage_path() -> str:
+    """Resolve the storage directory (mounted volume in Docker or local directory)"""
+    storage_path = os.getenv("TIDES_STORAGE_PATH", "./tides_data")
+    # Expand user home directory if present
+    if storage_path.startswith("~/"):
+        storage_path = os.path.expanduser(storage_path)
+    elif "${HOME}" in storage_path:
+        storage_path = storage_path.replace("${HOME}", os.path.expanduser("~"))
+
+    # If using default relative path, try to use a more appropriate location
+    if storage_path == "./tides_data":
+        # Try to use user's home directory as fallback
+        try:
+            home_path = os.path.expanduser("~/Documents/tides_data")
+            # Test if we can create the directory
+            if not os.path.isdir(home_path):
+                os.makedirs(home_path, exist_ok=True)
+            storage_path = home_path
+        except Exception:
+            # If that fails, keep the original path
+            pass
+
+    return storage_path
+
+
+@functools.cache
+def get_tide_storage() -> TideStorage:
+    """Return the shared storage, creating it on first use"""
+    # Optional group commit window for storage writes, in milliseconds
+    flush_interval_ms = os.getenv("TIDES_FLUSH_INTERVAL_MS")
+    return TideStorage(
+        _resolve_storage_path(),
+        flush_interval=int(flush_interval_ms) / 1000 if flush_interval_ms else None,
+    )
 
-# If using default relative path, try to use a more appropriate location
-if storage_path == "./tides_data":
-    # Try to use user's home directory as fallback
-    try:
-        home_path = os.path.expanduser("~/Documents/tides_data")
-        # Test if we can create the directory
-        os.makedirs(home_path, exist_ok=True)
-        storage_path = home_path
-    except Exception:
-        # If that fails, keep the original path
-        pass
 
-tide_storage = TideStorage(storage_path)
+def __getattr__(name: str) -> Any:
+    # Storage is created lazily so importing this module never touches disk;
+    # `tide_storage` stays available as a module attribute
+    if name == "tide_storage":
+        return get_tide_storage()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Schema definitions
@@ -170,42 +197,140 @@ tide_tools: list[types.Tool] = [
 ]
 
 
+# Response text, shared across calls
+GUIDANCE_MAP = {
+    "gentle": "🌊 Begin with calm, steady focus. Let thoughts flow naturally without forcing. Take breaks as needed.",
+    "moderate": "🌊 Maintain focused attention with deliberate action. Balance effort with ease. Stay present to the work.",
+    "strong": "🌊 Dive deep with sustained concentration. Channel energy into meaningful progress. Push through resistance mindfully.",
+}
+
+NEXT_ACTIONS = (
+    "🎯 Set clear intention for this flow session",
+    "⏰ Start timer and begin focused work",
+    "🧘 Take mindful breaks if needed",
+    "📝 Capture insights and progress",
+    "🌊 Honor the natural rhythm of the work",
+)
+
+SUMMARY_TEMPLATES = {
+    "completed": "🌊 Tide '{name}' completed successfully with {count} flow sessions. The natural rhythm has reached its conclusion.",
+    "paused": "🌊 Tide '{name}' paused gracefully with {count} flow sessions. The flow can resume when energy returns.",
+}
+
+
+@functools.lru_cache(maxsize=32)
+def _list_filter(flow_type: str | None, active_only: bool | None) -> ListTidesFilter:
+    """Return a shared filter; storage only reads it, so instances are reused"""
+    return ListTidesFilter.model_construct(flow_type=flow_type, active_only=active_only)
+
+
+# Response builders. Responses are assembled from server-side values, so
+# they are returned as plain dicts; the output schemas above document them.
+def _create_tide_result(
+    success: bool,
+    tide_id: str,
+    name: str,
+    flow_type: str,
+    created_at: str,
+    next_flow: str | None = None,
+) -> dict[str, Any]:
+    """Build a create_tide response (CreateTideOutputSchema)"""
+    return {
+        "success": success,
+        "tide_id": tide_id,
+        "name": name,
+        "flow_type": flow_type,
+        "created_at": created_at,
+        "next_flow": next_flow,
+    }
+
+
+def _tide_summary(tide: TideData) -> dict[str, Any]:
+    """Build a list_tides entry (TideSummary)"""
+    return {
+        "id": tide.id,
+        "name": tide.name,
+        "flow_type": tide.flow_type,
+        "status": tide.status,
+        "created_at": tide.created_at,
+        "last_flow": tide.last_flow,
+        "next_flow": tide.next_flow,
+    }
+
+
+def _flow_tide_result(
+    success: bool,
+    tide_id: str,
+    flow_started: str = "",
+    estimated_completion: str = "",
+    flow_guidance: str = "",
+    next_actions: list[str] | None = None,
+) -> dict[str, Any]:
+    """Build a flow_tide response (FlowTideOutputSchema)"""
+    return {
+        "success": success,
+        "tide_id": tide_id,
+        "flow_started": flow_started,
+        "estimated_completion": estimated_completion,
+        "flow_guidance": flow_guidance,
+        "next_actions": next_actions or [],
+    }
+
+
+def _end_tide_result(
+    success: bool,
+    tide_id: str,
+    final_status: str,
+    completion_time: str,
+    summary: str,
+) -> dict[str, Any]:
+    """Build an end_tide response (EndTideOutputSchema)"""
+    return {
+        "success": success,
+        "tide_id": tide_id,
+        "final_status": final_status,
+        "completion_time": completion_time,
+        "summary": summary,
+    }
+
+
 # Tool handlers
 async def create_tide_handler(args: dict) -> dict[str, Any]:
     """Handle tide creation"""
     validated_args = CreateTideInputSchema(**args)
 
     try:
-        input_data = CreateTideInput(
+        # Fields were validated by the input schema; skip re-validation
+        input_data = CreateTideInput.model_construct(
             name=validated_args.name,
             flow_type=validated_args.flow_type,
             description=validated_args.description,
         )
 
-        tide = await tide_storage.create_tide(input_data)
+        tide = await get_tide_storage().create_tide(input_data)
 
         logger.info(
             f"Creating tide: {validated_args.name} ({validated_args.flow_type})"
         )
 
-        return CreateTideOutputSchema(
+        return _create_tide_result(
             success=True,
             tide_id=tide.id,
             name=tide.name,
             flow_type=tide.flow_type,
             created_at=tide.created_at,
             next_flow=tide.next_flow,
-        ).model_dump()
+        )
 
     except Exception as error:
         logger.error(f"Failed to create tide: {error}")
-        return CreateTideOutputSchema(
+        return _create_tide_result(
             success=False,
             tide_id="",
             name=validated_args.name,
             flow_type=validated_args.flow_type,
             created_at=datetime.now().isoformat(),
-        ).model_dump()
+        )
 
 
 async def list_tides_handler(args: dict) -> dict[str, Any]:
@@ -213,32 +338,17 @@ async def list_tides_handler(args: dict) -> dict[str, Any]:
     validated_args = ListTidesInputSchema(**args)
 
     try:
-        filter_data = ListTidesFilter(
-            flow_type=validated_args.flow_type, active_only=validated_args.active_only
-        )
+        filter_data = _list_filter(validated_args.flow_type, validated_args.active_only)
 
-        tides = await tide_storage.list_tides(filter_data)
-
-        tide_summaries = [
-            TideSummary(
-                id=tide.id,
-                name=tide.name,
-                flow_type=tide.flow_type,
-                status=tide.status,
-                created_at=tide.created_at,
-                last_flow=tide.last_flow,
-                next_flow=tide.next_flow,
-            )
-            for tide in tides
-        ]
+        tides = await get_tide_storage().list_tides(filter_data)
+
+        tide_summaries = [_tide_summary(tide) for tide in tides]
 
-        return ListTidesOutputSchema(
-            tides=tide_summaries, total=len(tide_summaries)
-        ).model_dump()
+        return {"tides": tide_summaries, "total": len(tide_summaries)}
 
     except Exception as error:
         logger.error(f"Failed to list tides: {error}")
-        return ListTidesOutputSchema(tides=[], total=0).model_dump()
+        return {"tides": [], "total": 0}
 
 
 async def flow_tide_handler(args: dict) -> dict[str, Any]:
@@ -247,76 +357,56 @@ async def flow_tide_handler(args: dict) -> dict[str, Any]:
 
     try:
         # Verify tide exists
-        tide = await tide_storage.get_tide(validated_args.tide_id)
+        tide = await get_tide_storage().get_tide(validated_args.tide_id)
         if not tide:
-            return FlowTideOutputSchema(
+            return _flow_tide_result(
                 success=False,
                 tide_id=validated_args.tide_id,
-                flow_started="",
-                estimated_completion="",
                 flow_guidance="Tide not found",
-                next_actions=[],
-            ).model_dump()
+            )
 
-        flow_started = datetime.now().isoformat()
+        # One clock reading keeps start and estimated completion consistent
+        now = datetime.now()
+        flow_started = now.isoformat()
         duration = validated_args.duration or 25  # Default to 25 if None
-        estimated_completion = (
-            datetime.now() + timedelta(minutes=duration)
-        ).isoformat()
+        estimated_completion = (now + timedelta(minutes=duration)).isoformat()
 
         # Add flow to tide history
         intensity = (
             validated_args.intensity or "moderate"
         )  # Default to moderate if None
-        flow_entry = FlowEntry(
+        flow_entry = FlowEntry.model_construct(
             timestamp=flow_started,
             intensity=intensity,
             duration=duration,
         )
 
-        await tide_storage.add_flow_to_tide(validated_args.tide_id, flow_entry)
+        await get_tide_storage().add_flow_to_tide(validated_args.tide_id, flow_entry)
 
         # Generate guidance based on intensity
-        guidance_map = {
-            "gentle": "🌊 Begin with calm, steady focus. Let thoughts flow naturally without forcing. Take breaks as needed.",
-            "moderate": "🌊 Maintain focused attention with deliberate action. Balance effort with ease. Stay present to the work.",
-            "strong": "🌊 Dive deep with sustained concentration. Channel energy into meaningful progress. Push through resistance mindfully.",
-        }
-
-        flow_guidance = guidance_map[intensity]
-
-        next_actions = [
-            "🎯 Set clear intention for this flow session",
-            "⏰ Start timer and begin focused work",
-            "🧘 Take mindful breaks if needed",
-            "📝 Capture insights and progress",
-            "🌊 Honor the natural rhythm of the work",
-        ]
+        flow_guidance = GUIDANCE_MAP[intensity]
 
         logger.info(
             f"Starting flow session for tide: {validated_args.tide_id} "
             f"({validated_args.intensity} intensity, {validated_args.duration}min)"
         )
 
-        return FlowTideOutputSchema(
+        return _flow_tide_result(
             success=True,
             tide_id=validated_args.tide_id,
             flow_started=flow_started,
             estimated_completion=estimated_completion,
             flow_guidance=flow_guidance,
-            next_actions=next_actions,
-        ).model_dump()
+            next_actions=list(NEXT_ACTIONS),
+        )
 
     except Exception as error:
         logger.error(f"Failed to start flow: {error}")
-        return FlowTideOutputSchema(
+        return _flow_tide_result(
             success=False,
             tide_id=validated_args.tide_id,
-            flow_started="",
-            estimated_completion="",
             flow_guidance="Failed to start flow session",
-            next_actions=[],
-        ).model_dump()
+        )
 
 
 async def end_tide_handler(args: dict) -> dict[str, Any]:
@@ -324,85 +414,74 @@ async def end_tide_handler(args: dict) -> dict[str, Any]:
     validated_args = EndTideInputSchema(**args)
 
     try:
-        # Verify tide exists
-        tide = await tide_storage.get_tide(validated_args.tide_id)
+        # Tides are never reopened, so a cached tide that has ended and whose
+        # files are unchanged needs no read; otherwise verify it exists
+        storage = get_tide_storage()
+        tide = storage.peek_tide(validated_args.tide_id)
+        if not tide or tide.status == "active":
+            tide = await storage.get_tide(validated_args.tide_id)
         if not tide:
-            return EndTideOutputSchema(
+            return _end_tide_result(
                 success=False,
                 tide_id=validated_args.tide_id,
                 final_status="not_found",
                 completion_time="",
                 summary="Tide not found",
-            ).model_dump()
+            )
 
         # Check if tide is already completed or paused
         if tide.status in ["completed", "paused"]:
-            return EndTideOutputSchema(
+            return _end_tide_result(
                 success=False,
                 tide_id=validated_args.tide_id,
                 final_status=tide.status,
                 completion_time=tide.created_at,
                 summary=f"Tide is already {tide.status}",
-            ).model_dump()
+            )
 
         completion_time = datetime.now().isoformat()
 
         # Update tide status
-        updates = {
+        updates: dict[str, Any] = {
             "status": validated_args.status,
             "last_flow": completion_time,
         }
 
-        # Add completion notes if provided
-        if validated_args.notes:
-            if tide.flow_history:
-                # Add notes to the last flow entry
-                last_flow = tide.flow_history[-1]
-                last_flow.notes = validated_args.notes
-            else:
-                # Create a completion flow entry
-                completion_flow = FlowEntry(
-                    timestamp=completion_time,
-                    intensity="gentle",
-                    duration=0,
-                    notes=validated_args.notes,
-                )
-                await tide_storage.add_flow_to_tide(
-                    validated_args.tide_id, completion_flow
-                )
-
-        await tide_storage.update_tide(validated_args.tide_id, updates)
+        # Status and completion notes are saved in one write; storage puts the
+        # notes on the latest flow entry, or a completion entry if there is none
+        await storage.apply_updates(
+            validated_args.tide_id,
+            updates,
+            last_flow_notes=validated_args.notes or None,
+        )
 
         # Generate summary
         flow_count = len(tide.flow_history)
-        summary_map = {
-            "completed": f"🌊 Tide '{tide.name}' completed successfully with {flow_count} flow sessions. The natural rhythm has reached its conclusion.",
-            "paused": f"🌊 Tide '{tide.name}' paused gracefully with {flow_count} flow sessions. The flow can resume when energy returns.",
-        }
-
-        summary = summary_map[validated_args.status]
+        summary = SUMMARY_TEMPLATES[validated_args.status].format(
+            name=tide.name, count=flow_count
+        )
 
         logger.info(
             f"Ended tide: {validated_args.tide_id} with status {validated_args.status}"
         )
 
-        return EndTideOutputSchema(
+        return _end_tide_result(
             success=True,
             tide_id=validated_args.tide_id,
             final_status=validated_args.status,
             completion_time=completion_time,
             summary=summary,
-        ).model_dump()
+        )
 
     except Exception as error:
         logger.error(f"Failed to end tide: {error}")
-        return EndTideOutputSchema(
+        return _end_tide_result(
             success=False,
             tide_id=validated_args.tide_id,
             final_status="error",
             completion_time="",
             summary=f"Failed to end tide: {error}",
-        ).model_dump()
+        )
 
 
 # Handler mapping
@@ -2,32 +2,70 @@
 Pytest configuration and fixtures
 """
 
-import asyncio
-import tempfile
-from collections.abc import Generator
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 
-from server.storage.tide_storage import TideStorage
+from server.storage.tide_storage import TideData, TideStorage
+from server.tools import tide_tools
 
 
-@pytest.fixture(scope="function")
-def temp_storage_dir() -> Generator[Path, None, None]:
-    """Create a temporary directory for storage testing"""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield Path(temp_dir)
+@pytest.fixture
+def temp_storage_dir(tmp_path: Path) -> Path:
+    """Create an isolated storage directory for a single test"""
+    return tmp_path
 
 
 @pytest.fixture
 def tide_storage(temp_storage_dir: Path) -> TideStorage:
     """Create a TideStorage instance with temporary directory"""
+    # TideStorage keeps per-instance caches, so instances stay function-scoped
     return TideStorage(str(temp_storage_dir))
 
 
+@pytest.fixture
+def tide_storage_mock(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Replace the storage used by tool handlers with an autospec'd mock"""
+    # Async storage methods become AsyncMocks; peek_tide knows no tides, so
+    # handlers always go through get_tide
+    storage = MagicMock(spec=TideStorage)
+    storage.peek_tide.return_value = None
+    monkeypatch.setattr(tide_tools, "get_tide_storage", lambda: storage)
+    return storage
+
+
+@pytest.fixture(scope="session")
+def mock_tide_123() -> TideData:
+    """Active daily tide shared by tool tests; treat it as read-only"""
+    return TideData(
+        id="tide_123",
+        name="Test Tide",
+        flow_type="daily",
+        status="active",
+        created_at="2024-01-01T00:00:00",
+        flow_history=[],
+    )
+
+
+@pytest.fixture(scope="session")
+def mock_created_tide_123(mock_tide_123: TideData) -> TideData:
+    """The shared tide as create_tide returns it, with schedule and description"""
+    return mock_tide_123.model_copy(
+        update={"next_flow": "2024-01-02T00:00:00", "description": "A test tide"}
+    )
+
+
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def mock_tides() -> list[TideData]:
+    """Two active daily tides as list_tides returns them; treat as read-only"""
+    template = {
+        "flow_type": "daily",
+        "status": "active",
+        "created_at": "2024-01-01T00:00:00",
+        "flow_history": [],
+    }
+    return [
+        TideData(id=tide_id, name=name, **template)
+        for tide_id, name in [("tide_1", "Morning Tide"), ("tide_2", "Evening Tide")]
+    ]
@@ -0,0 +1,75 @@
+"""
+Tests for the MCP server process
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SERVER_SCRIPT = Path(__file__).parents[1] / "server" / "main.py"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGTERM cannot be handled")
+def test_sigterm_flushes_buffered_saves(temp_storage_dir: Path):
+    """Test that stopping the server with SIGTERM still writes buffered flows"""
+    env = {
+        **os.environ,
+        "TIDES_STORAGE_PATH": str(temp_storage_dir),
+        # Long enough that only the shutdown flush can write the flow
+        "TIDES_FLUSH_INTERVAL_MS": "60000",
+    }
+    process = subprocess.Popen(
+        [sys.executable, str(SERVER_SCRIPT)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        text=True,
+    )
+    assert process.stdin is not None
+    assert process.stdout is not None
+
+    def request(request_id: int, method: str, params: dict) -> dict:
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        process.stdin.write(json.dumps({**message, "params": params}) + "\n")
+        process.stdin.flush()
+        return json.loads(process.stdout.readline())["result"]
+
+    def call_tool(request_id: int, name: str, arguments: dict) -> dict:
+        result = request(
+            request_id, "tools/call", {"name": name, "arguments": arguments}
+        )
+        return json.loads(result["content"][0]["text"])
+
+    try:
+        request(
+            1,
+            "initialize",
+            {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "test", "version": "0"},
+            },
+        )
+        process.stdin.write(
+            json.dumps({"jsonrpc": "2.0", "method": "notifications/initialized"}) + "\n"
+        )
+        created = call_tool(2, "create_tide", {"name": "Test", "flow_type": "daily"})
+        flowed = call_tool(3, "flow_tide", {"tide_id": created["tide_id"]})
+        assert flowed["success"] is True
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=10) == -signal.SIGTERM
+    finally:
+        process.kill()
+        process.wait()
+        process.stdin.close()
+        process.stdout.close()
+
+    flows_path = temp_storage_dir / f"{created['tide_id']}.flows.jsonl"
+    assert len(flows_path.read_text().splitlines()) == 1
@@ -2,7 +2,10 @@
 Tests for tide storage functionality
 """
 
+import asyncio
+import threading
 from datetime import datetime, timedelta
+from pathlib import Path
 
 import pytest
 
@@ -10,6 +13,8 @@ from server.storage.tide_storage import (
     CreateTideInput,
     FlowEntry,
     ListTidesFilter,
+    TideData,
+    TideStamp,
     TideStorage,
 )
 
@@ -17,7 +22,6 @@ from server.storage.tide_storage import (
 class TestTideStorage:
     """Test suite for TideStorage"""
 
-    @pytest.mark.asyncio
     async def test_create_tide(self, tide_storage: TideStorage):
         """Test creating a new tide"""
         # Create a daily tide
@@ -43,7 +47,6 @@ class TestTideStorage:
         time_diff = abs((next_flow_time - expected_time).total_seconds())
         assert time_diff < 60  # Within 1 minute tolerance
 
-    @pytest.mark.asyncio
     async def test_create_tide_different_types(self, tide_storage: TideStorage):
         """Test creating tides with different flow types"""
         flow_types = {
@@ -71,7 +74,6 @@ class TestTideStorage:
             else:
                 assert tide.next_flow is None
 
-    @pytest.mark.asyncio
     async def test_get_tide(self, tide_storage: TideStorage):
         """Test retrieving a tide by ID"""
         # Create a tide
@@ -86,13 +88,24 @@ class TestTideStorage:
         assert retrieved_tide.name == created_tide.name
         assert retrieved_tide.flow_type == created_tide.flow_type
 
-    @pytest.mark.asyncio
     async def test_get_nonexistent_tide(self, tide_storage: TideStorage):
         """Test retrieving a non-existent tide"""
         tide = await tide_storage.get_tide("nonexistent_id")
         assert tide is None
 
-    @pytest.mark.asyncio
+    async def test_peek_tide_returns_known_state(self, tide_storage: TideStorage):
+        """Test peeking at a tide from memory"""
+        assert tide_storage.peek_tide("nonexistent_id") is None
+
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Peeked", flow_type="daily")
+        )
+        await tide_storage.update_tide(tide.id, {"status": "paused"})
+
+        peeked = tide_storage.peek_tide(tide.id)
+        assert peeked is not None
+        assert peeked.status == "paused"
+
     async def test_list_tides(self, tide_storage: TideStorage):
         """Test listing all tides"""
         # Create multiple tides
@@ -110,7 +123,78 @@ class TestTideStorage:
         assert tides[1].name == "Afternoon Tide"
         assert tides[2].name == "Morning Tide"
 
-    @pytest.mark.asyncio
+    async def test_list_tides_orders_timestamps_without_microseconds(
+        self, tide_storage: TideStorage, temp_storage_dir: Path
+    ):
+        """Test ordering when isoformat() dropped a zero microsecond part"""
+        for tide_id, created_at in [
+            ("tide_a", "2024-01-01T00:00:00.500000"),
+            ("tide_b", "2024-01-01T00:00:01"),
+            ("tide_c", "2024-01-01T00:00:00"),
+        ]:
+            tide = TideData(
+                id=tide_id,
+                name=tide_id,
+                flow_type="daily",
+                status="active",
+                created_at=created_at,
+            )
+            (temp_storage_dir / f"{tide_id}.json").write_text(tide.model_dump_json())
+
+        tides = await tide_storage.list_tides()
+
+        assert [tide.id for tide in tides] == ["tide_b", "tide_a", "tide_c"]
+
+    async def test_concurrent_flows_are_all_recorded(self, tide_storage: TideStorage):
+        """Test that flows added concurrently all reach the flow log"""
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Busy Tide", flow_type="project")
+        )
+
+        await asyncio.gather(
+            *(
+                tide_storage.add_flow_to_tide(
+                    tide.id,
+                    FlowEntry(
+                        timestamp=f"2025-01-01T10:0{i}:00",
+                        intensity="gentle",
+                        duration=i,
+                    ),
+                )
+                for i in range(5)
+            )
+        )
+
+        for storage in (tide_storage, TideStorage(str(tide_storage.data_dir))):
+            reloaded = await storage.get_tide(tide.id)
+            assert reloaded is not None
+            durations = [flow.duration for flow in reloaded.flow_history]
+            assert durations == [0, 1, 2, 3, 4]
+
+    async def test_cache_is_only_modified_on_event_loop(
+        self, tide_storage: TideStorage
+    ):
+        """Test that writes update the cache on the loop, not in worker threads"""
+        writers = []
+
+        class RecordingDict(dict):
+            def __setitem__(self, key, value):
+                writers.append(threading.current_thread())
+                super().__setitem__(key, value)
+
+        tide_storage._cache = RecordingDict()
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Test Tide", flow_type="daily")
+        )
+        await tide_storage.add_flow_to_tide(
+            tide.id,
+            FlowEntry(
+                timestamp=datetime.now().isoformat(), intensity="moderate", duration=25
+            ),
+        )
+
+        assert writers == [threading.current_thread()] * 2
+
     async def test_list_tides_with_filters(self, tide_storage: TideStorage):
         """Test listing tides with filters"""
         # Create tides with different types
@@ -131,7 +215,52 @@ class TestTideStorage:
         assert len(daily_tides) == 2
         assert all(tide.flow_type == "daily" for tide in daily_tides)
 
-    @pytest.mark.asyncio
+    async def test_list_tides_skips_invalid_files(
+        self, tide_storage: TideStorage, temp_storage_dir: Path
+    ):
+        """Test that unreadable tide files are ignored when listing"""
+        await tide_storage.create_tide(CreateTideInput(name="Valid", flow_type="daily"))
+        (temp_storage_dir / "broken.json").write_text("{not json")
+        (temp_storage_dir / "partial.json").write_text('{"id": "partial"}')
+
+        tides = await tide_storage.list_tides()
+
+        assert [tide.name for tide in tides] == ["Valid"]
+
+    async def test_list_tides_picks_up_external_changes(
+        self, tide_storage: TideStorage, temp_storage_dir: Path
+    ):
+        """Test that cached tides are re-read when their files change"""
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Original", flow_type="daily")
+        )
+        assert [t.name for t in await tide_storage.list_tides()] == ["Original"]
+
+        # Another process edits the file behind the storage's back
+        file_path = temp_storage_dir / f"{tide.id}.json"
+        edited = tide.model_copy(update={"name": "Edited elsewhere"})
+        file_path.write_text(edited.model_dump_json(indent=2))
+
+        assert [t.name for t in await tide_storage.list_tides()] == ["Edited elsewhere"]
+
+        file_path.unlink()
+        assert await tide_storage.list_tides() == []
+        assert await tide_storage.get_tide(tide.id) is None
+
+    async def test_get_tide_returns_independent_copy(self, tide_storage: TideStorage):
+        """Test that modifying a fetched tide does not leak into storage"""
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Test Tide", flow_type="daily")
+        )
+
+        fetched = await tide_storage.get_tide(tide.id)
+        assert fetched is not None
+        fetched.name = "Modified in memory"
+
+        refetched = await tide_storage.get_tide(tide.id)
+        assert refetched is not None
+        assert refetched.name == "Test Tide"
+
     async def test_add_flow_to_tide(self, tide_storage: TideStorage):
         """Test adding a flow entry to a tide"""
         # Create a tide
@@ -158,7 +287,356 @@ class TestTideStorage:
         time_diff = abs((next_flow_time - expected_time).total_seconds())
         assert time_diff < 60  # Within 1 minute tolerance
 
-    @pytest.mark.asyncio
+    async def test_saved_file_round_trips(
+        self, tide_storage: TideStorage, temp_storage_dir: Path
+    ):
+        """Test that saved tide files are UTF-8 JSON readable by a fresh storage"""
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Marée 🌊", flow_type="weekly")
+        )
+
+        raw = (temp_storage_dir / f"{tide.id}.json").read_bytes()
+        assert "Marée 🌊".encode() in raw
+
+        reloaded = await TideStorage(str(temp_storage_dir)).get_tide(tide.id)
+        assert reloaded == tide
+
+    async def test_add_flow_appends_to_flow_log(
+        self, tide_storage: TideStorage, temp_storage_dir: Path
+    ):
+        """Test that flows go to a side-car log instead of the metadata file"""
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Test Tide", flow_type="daily")
+        )
+
+        for duration in (25, 50):
+            await tide_storage.add_flow_to_tide(
+                tide.id,
+                FlowEntry(
+                    timestamp=datetime.now().isoformat(),
+                    intensity="gentle",
+                    duration=duration,
+                ),
+            )
+
+        metadata_json = (temp_storage_dir / f"{tide.id}.json").read_text()
+        assert "flow_history" not in metadata_json
+        assert TideData.model_validate_json(metadata_json).last_flow is not None
+
+        flow_lines = (temp_storage_dir / f"{tide.id}.flows.jsonl").read_text()
+        assert len(flow_lines.splitlines()) == 2
+
+        reloaded = await TideStorage(str(temp_storage_dir)).get_tide(tide.id)
+        assert reloaded is not None
+        assert [flow.duration for flow in reloaded.flow_history] == [25, 50]
+
+    async def test_add_flow_migrates_inline_history(
+        self, tide_storage: TideStorage, temp_storage_dir: Path
+    ):
+        """Test that a tide file with inline history keeps it after a new flow"""
+        legacy = TideData(
+            id="tide_legacy",
+            name="Legacy Tide",
+            flow_type="project",
+            status="active",
+            created_at=datetime.now().isoformat(),
+            flow_history=[
+                FlowEntry(
+                    timestamp=datetime.now().isoformat(),
+                    intensity="strong",
+                    duration=90,
+                )
+            ],
+        )
+        (temp_storage_dir / "tide_legacy.json").write_text(legacy.model_dump_json())
+
+        await tide_storage.add_flow_to_tide(
+            "tide_legacy",
+            FlowEntry(
+                timestamp=datetime.now().isoformat(), intensity="gentle", duration=15
+            ),
+        )
+
+        reloaded = await TideStorage(str(temp_storage_dir)).get_tide("tide_legacy")
+        assert reloaded is not None
+        assert [flow.duration for flow in reloaded.flow_history] == [90, 15]
+
+    async def test_torn_flow_log_line_is_ignored(
+        self, tide_storage: TideStorage, temp_storage_dir: Path
+    ):
+        """Test that a partially written final flow line does not hide the tide"""
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Test Tide", flow_type="daily")
+        )
+        await tide_storage.add_flow_to_tide(
+            tide.id,
+            FlowEntry(
+                timestamp=datetime.now().isoformat(), intensity="moderate", duration=25
+            ),
+        )
+        with open(temp_storage_dir / f"{tide.id}.flows.jsonl", "a") as f:
+            f.write('{"timestamp": "2024-')
+
+        tides = await tide_storage.list_tides()
+
+        assert len(tides) == 1
+        assert len(tides[0].flow_history) == 1
+
+        # The next append starts on a fresh line and survives a reload
+        await tide_storage.add_flow_to_tide(
+            tide.id,
+            FlowEntry(
+                timestamp=datetime.now().isoformat(), intensity="gentle", duration=15
+            ),
+        )
+        reloaded = await TideStorage(str(temp_storage_dir)).get_tide(tide.id)
+        assert reloaded is not None
+        assert [flow.intensity for flow in reloaded.flow_history] == [
+            "moderate",
+            "gentle",
+        ]
+
+    async def test_saves_replace_files_atomically(
+        self, tide_storage: TideStorage, temp_storage_dir: Path
+    ):
+        """Test that saves leave no temp files and stray ones are ignored"""
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Test Tide", flow_type="daily")
+        )
+        await tide_storage.update_tide(tide.id, {"status": "paused"})
+        assert sorted(path.name for path in temp_storage_dir.iterdir()) == [
+            f"{tide.id}.json"
+        ]
+
+        # Leftover from a write interrupted before os.replace
+        (temp_storage_dir / f"{tide.id}.json.0123abcd.tmp").write_text('{"id": ')
+
+        tides = await tide_storage.list_tides()
+        assert [t.status for t in tides] == ["paused"]
+
+    async def test_peek_tide_checks_files_are_unchanged(
+        self, tide_storage: TideStorage, temp_storage_dir: Path
+    ):
+        """Test that peek_tide ignores cached tides whose files changed"""
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Test Tide", flow_type="daily")
+        )
+        await tide_storage.update_tide(tide.id, {"status": "paused"})
+        peeked = tide_storage.peek_tide(tide.id)
+        assert peeked is not None
+        assert peeked.status == "paused"
+
+        # Hand edit that changes the file size
+        file_path = temp_storage_dir / f"{tide.id}.json"
+        file_path.write_text(file_path.read_text().replace("Test Tide", "Edited"))
+        assert tide_storage.peek_tide(tide.id) is None
+
+        file_path.unlink()
+        assert tide_storage.peek_tide(tide.id) is None
+
+    async def test_apply_updates_records_flow_in_one_save(
+        self, tide_storage: TideStorage, temp_storage_dir: Path
+    ):
+        """Test updating fields and appending a flow together"""
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Ending Tide", flow_type="daily")
+        )
+        flow = FlowEntry(
+            timestamp="2025-01-01T10:00:00",
+            intensity="gentle",
+            duration=0,
+            notes="Wrapped up",
+        )
+
+        updated = await tide_storage.apply_updates(
+            tide.id, {"status": "completed"}, append_flow=flow
+        )
+
+        assert updated is not None
+        assert updated.status == "completed"
+        assert updated.last_flow == flow.timestamp
+        assert updated.next_flow == "2025-01-02T10:00:00"
+
+        reloaded = await TideStorage(str(temp_storage_dir)).get_tide(tide.id)
+        assert reloaded == updated
+
+    async def test_apply_updates_sets_notes_on_last_flow(
+        self, tide_storage: TideStorage, temp_storage_dir: Path
+    ):
+        """Test that notes go on the latest flow, including ones added concurrently"""
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Ending Tide", flow_type="project")
+        )
+        flows = [
+            FlowEntry(
+                timestamp=f"2025-01-01T10:0{i}:00", intensity="gentle", duration=d
+            )
+            for i, d in enumerate((10, 20))
+        ]
+        await tide_storage.add_flow_to_tide(tide.id, flows[0])
+
+        await asyncio.gather(
+            tide_storage.add_flow_to_tide(tide.id, flows[1]),
+            tide_storage.apply_updates(
+                tide.id, {"status": "completed"}, last_flow_notes="done"
+            ),
+        )
+
+        reloaded = await TideStorage(str(temp_storage_dir)).get_tide(tide.id)
+        assert reloaded is not None
+        assert reloaded.status == "completed"
+        assert [(f.duration, f.notes) for f in reloaded.flow_history] == [
+            (10, None),
+            (20, "done"),
+        ]
+
+    async def test_apply_updates_notes_without_flows_add_completion_entry(
+        self, tide_storage: TideStorage
+    ):
+        """Test that notes on a tide without flows are saved on a new entry"""
+        tide = await tide_storage.create_tide(
+            CreateTideInput(name="Ending Tide", flow_type="project")
+        )
+
+        updated = await tide_storage.apply_updates(
+            tide.id,
+            {"status": "completed", "last_flow": "2025-01-01T10:00:00"},
+            last_flow_notes="done",
+        )
+
+        assert updated is not None
+        assert [(f.timestamp, f.duration, f.notes) for f in updated.flow_history] == [
+            ("2025-01-01T10:00:00", 0, "done")
+        ]
+
+    async def test_buffered_saves_are_visible_before_flush(
+        self, temp_storage_dir: Path
+    ):
+        """Test that group commit defers writes but not reads of new data"""
+        storage = TideStorage(str(temp_storage_dir), flush_interval=60)
+        tide = await storage.create_tide(
+            CreateTideInput(name="Buffered", flow_type="daily")
+        )
+        file_path = temp_storage_dir / f"{tide.id}.json"
+        created = file_path.read_bytes()
+
+        await storage.update_tide(tide.id, {"name": "Renamed"})
+        await storage.add_flow_to_tide(
+            tide.id,
+            FlowEntry(
+                timestamp=datetime.now().isoformat(), intensity="gentle", duration=10
+            ),
+        )
+
+        assert file_path.read_bytes() == created
+        fetched = await storage.get_tide(tide.id)
+        assert fetched is not None
+        assert fetched.name == "Renamed"
+        assert [t.name for t in await storage.list_tides()] == ["Renamed"]
+
+        await storage.flush()
+
+        reloaded = await TideStorage(str(temp_storage_dir)).get_tide(tide.id)
+        assert reloaded is not None
+        assert reloaded.name == "Renamed"
+        assert len(reloaded.flow_history) == 1
+
+    async def test_failed_background_flush_is_logged_and_retried(
+        self,
+        temp_storage_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        """Test that a failed scheduled flush is reported and rescheduled"""
+        storage = TideStorage(str(temp_storage_dir), flush_interval=0.01)
+        tide = await storage.create_tide(
+            CreateTideInput(name="Buffered", flow_type="weekly")
+        )
+        await storage.update_tide(tide.id, {"name": "Renamed"})
+
+        write_tide = storage._write_tide
+
+        def fail_once(tide: TideData) -> TideStamp:
+            monkeypatch.setattr(storage, "_write_tide", write_tide)
+            raise OSError("disk full")
+
+        monkeypatch.setattr(storage, "_write_tide", fail_once)
+        flush_task = storage._flush_task
+        assert flush_task is not None
+        await flush_task
+
+        assert "Failed to flush buffered tide saves" in caplog.text
+        retry_task = storage._flush_task
+        assert retry_task is not None
+        await retry_task
+
+        reloaded = await TideStorage(str(temp_storage_dir)).get_tide(tide.id)
+        assert reloaded is not None
+        assert reloaded.name == "Renamed"
+
+    async def test_buffered_flows_are_appended_together(self, temp_storage_dir: Path):
+        """Test that flows buffered for one tide reach the log in one append"""
+        storage = TideStorage(str(temp_storage_dir), flush_interval=60)
+        tide = await storage.create_tide(
+            CreateTideInput(name="Buffered", flow_type="project")
+        )
+        flows_path = temp_storage_dir / f"{tide.id}.flows.jsonl"
+
+        for duration in (10, 20, 30):
+            await storage.add_flow_to_tide(
+                tide.id,
+                FlowEntry(
+                    timestamp=datetime.now().isoformat(),
+                    intensity="gentle",
+                    duration=duration,
+                ),
+            )
+        assert not flows_path.exists()
+
+        await storage.flush()
+
+        lines = flows_path.read_bytes().splitlines()
+        durations = [FlowEntry.model_validate_json(line).duration for line in lines]
+        assert durations == [10, 20, 30]
+
+    async def test_critical_saves_bypass_buffer(self, temp_storage_dir: Path):
+        """Test that creation and status changes are written immediately"""
+        storage = TideStorage(str(temp_storage_dir), flush_interval=60)
+        tide = await storage.create_tide(
+            CreateTideInput(name="Critical", flow_type="daily")
+        )
+        await storage.add_flow_to_tide(
+            tide.id,
+            FlowEntry(
+                timestamp=datetime.now().isoformat(), intensity="strong", duration=25
+            ),
+        )
+
+        await storage.update_tide(tide.id, {"status": "completed"})
+
+        reloaded = await TideStorage(str(temp_storage_dir)).get_tide(tide.id)
+        assert reloaded is not None
+        assert reloaded.status == "completed"
+        assert len(reloaded.flow_history) == 1
+        assert await storage.list_tides() == [reloaded]
+
+    async def test_buffered_saves_flush_after_interval(self, temp_storage_dir: Path):
+        """Test that buffered saves reach disk once the interval elapses"""
+        storage = TideStorage(str(temp_storage_dir), flush_interval=0.01)
+        tide = await storage.create_tide(
+            CreateTideInput(name="Buffered", flow_type="weekly")
+        )
+
+        await storage.update_tide(tide.id, {"name": "Renamed"})
+        # Wait on the scheduled flush itself rather than the clock
+        flush_task = storage._flush_task
+        assert flush_task is not None
+        await flush_task
+
+        reloaded = await TideStorage(str(temp_storage_dir)).get_tide(tide.id)
+        assert reloaded is not None
+        assert reloaded.name == "Renamed"
+
     async def test_update_tide(self, tide_storage: TideStorage):
         """Test updating a tide"""
         # Create a tide
@@ -2,12 +2,15 @@
 Tests for tide tools functionality
 """
 
-from datetime import datetime, timedelta
-from unittest.mock import patch
+from datetime import datetime
+from types import MappingProxyType
+from unittest.mock import MagicMock
 
 import pytest
+from pydantic import BaseModel
 
 from server.storage.tide_storage import TideData
+from server.tools import tide_tools
 from server.tools.tide_tools import (
     CreateTideInputSchema,
     EndTideInputSchema,
@@ -19,242 +22,243 @@ from server.tools.tide_tools import (
     list_tides_handler,
 )
 
+# Fixed clock seen by the handlers; mock tides are created at the same instant
+FROZEN_NOW = datetime(2024, 1, 1)
 
-class TestTideTools:
-    """Test suite for tide tool handlers"""
-
-    @pytest.mark.asyncio
-    async def test_create_tide_handler_success(self):
-        """Test successful tide creation"""
-        args = {"name": "Test Tide", "flow_type": "daily", "description": "A test tide"}
-
-        mock_tide = TideData(
-            id="tide_123",
-            name="Test Tide",
-            flow_type="daily",
-            status="active",
-            created_at=datetime.now().isoformat(),
-            next_flow=(datetime.now() + timedelta(days=1)).isoformat(),
-            description="A test tide",
-            flow_history=[],
-        )
-
-        with patch(
-            "server.tools.tide_tools.tide_storage.create_tide", return_value=mock_tide
-        ):
-            result = await create_tide_handler(args)
-
-        assert result["success"] is True
-        assert result["tide_id"] == "tide_123"
-        assert result["name"] == "Test Tide"
-        assert result["flow_type"] == "daily"
-        assert result["next_flow"] is not None
-
-    @pytest.mark.asyncio
-    async def test_create_tide_handler_error(self):
-        """Test tide creation error handling"""
-        args = {"name": "Test Tide", "flow_type": "daily"}
-
-        with patch(
-            "server.tools.tide_tools.tide_storage.create_tide",
-            side_effect=Exception("Storage error"),
-        ):
-            result = await create_tide_handler(args)
-
-        assert result["success"] is False
-        assert result["tide_id"] == ""
-        assert result["name"] == "Test Tide"
-
-    @pytest.mark.asyncio
-    async def test_list_tides_handler_success(self):
-        """Test successful tide listing"""
-        args = {"flow_type": "daily", "active_only": True}
-
-        mock_tides = [
-            TideData(
-                id="tide_1",
-                name="Morning Tide",
-                flow_type="daily",
-                status="active",
-                created_at=datetime.now().isoformat(),
-                flow_history=[],
-            ),
-            TideData(
-                id="tide_2",
-                name="Evening Tide",
-                flow_type="daily",
-                status="active",
-                created_at=datetime.now().isoformat(),
-                flow_history=[],
-            ),
-        ]
-
-        with patch(
-            "server.tools.tide_tools.tide_storage.list_tides", return_value=mock_tides
-        ):
-            result = await list_tides_handler(args)
-
-        assert len(result["tides"]) == 2
-        assert result["total"] == 2
-        assert result["tides"][0]["name"] == "Morning Tide"
-        assert result["tides"][1]["name"] == "Evening Tide"
-
-    @pytest.mark.asyncio
-    async def test_list_tides_handler_empty(self):
-        """Test listing tides when none exist"""
-        args = {}
-
-        with patch("server.tools.tide_tools.tide_storage.list_tides", return_value=[]):
-            result = await list_tides_handler(args)
-
-        assert len(result["tides"]) == 0
-        assert result["total"] == 0
-
-    @pytest.mark.asyncio
-    async def test_flow_tide_handler_success(self):
-        """Test successful flow session start"""
-        args = {"tide_id": "tide_123", "intensity": "moderate", "duration": 25}
-
-        mock_tide = TideData(
-            id="tide_123",
-            name="Test Tide",
-            flow_type="daily",
-            status="active",
-            created_at=datetime.now().isoformat(),
-            flow_history=[],
-        )
-
-        with patch(
-            "server.tools.tide_tools.tide_storage.get_tide", return_value=mock_tide
-        ):
-            with patch(
-                "server.tools.tide_tools.tide_storage.add_flow_to_tide",
-                return_value=mock_tide,
-            ):
-                result = await flow_tide_handler(args)
-
-        assert result["success"] is True
-        assert result["tide_id"] == "tide_123"
-        assert result["flow_started"] is not None
-        assert result["estimated_completion"] is not None
-        assert "focused attention" in result["flow_guidance"].lower()
-        assert len(result["next_actions"]) > 0
-
-    @pytest.mark.asyncio
-    async def test_flow_tide_handler_not_found(self):
-        """Test flow session with non-existent tide"""
-        args = {"tide_id": "nonexistent", "intensity": "moderate", "duration": 25}
-
-        with patch("server.tools.tide_tools.tide_storage.get_tide", return_value=None):
-            result = await flow_tide_handler(args)
-
-        assert result["success"] is False
-        assert result["flow_guidance"] == "Tide not found"
-        assert len(result["next_actions"]) == 0
-
-    @pytest.mark.asyncio
-    async def test_flow_tide_handler_different_intensities(self):
-        """Test flow session with different intensities"""
-        intensities = ["gentle", "moderate", "strong"]
-
-        mock_tide = TideData(
-            id="tide_123",
-            name="Test Tide",
-            flow_type="daily",
-            status="active",
-            created_at=datetime.now().isoformat(),
-            flow_history=[],
-        )
-
-        for intensity in intensities:
-            args = {"tide_id": "tide_123", "intensity": intensity, "duration": 25}
-
-            with patch(
-                "server.tools.tide_tools.tide_storage.get_tide", return_value=mock_tide
-            ):
-                with patch(
-                    "server.tools.tide_tools.tide_storage.add_flow_to_tide",
-                    return_value=mock_tide,
-                ):
-                    result = await flow_tide_handler(args)
-
-            assert result["success"] is True
-            assert (
-                intensity in result["flow_guidance"].lower()
-                or "🌊" in result["flow_guidance"]
-            )
-
-    def test_schema_validation(self):
-        """Test input schema validation"""
-        # Valid inputs
-        CreateTideInputSchema(name="Test", flow_type="daily")
-        CreateTideInputSchema(
-            name="Test", flow_type="weekly", description="A weekly tide"
-        )
-
-        # Invalid flow type
-        with pytest.raises(ValueError):
-            CreateTideInputSchema(name="Test", flow_type="invalid")
-
-        # Missing required fields
-        with pytest.raises(ValueError):
-            CreateTideInputSchema(flow_type="daily")
-
-        # Test optional fields
-        list_schema = ListTidesInputSchema()
-        assert list_schema.flow_type is None
-        assert list_schema.active_only is None
-
-        # Test flow schema defaults
-        flow_schema = FlowTideInputSchema(tide_id="test_id")
-        assert flow_schema.intensity == "moderate"
-        assert flow_schema.duration == 25
-
-        # Test end tide schema
-        end_schema = EndTideInputSchema(tide_id="test_123")
-        assert end_schema.status == "completed"
-        assert end_schema.notes is None
-
-    @pytest.mark.asyncio
-    async def test_end_tide_handler_success(self):
-        """Test successful tide completion"""
-        args = {"tide_id": "tide_123", "status": "completed", "notes": "Great session!"}
-
-        mock_tide = TideData(
-            id="tide_123",
-            name="Test Tide",
-            flow_type="daily",
-            status="active",
-            created_at=datetime.now().isoformat(),
-            flow_history=[],
-        )
-
-        with patch(
-            "server.tools.tide_tools.tide_storage.get_tide", return_value=mock_tide
-        ):
-            with patch(
-                "server.tools.tide_tools.tide_storage.update_tide",
-                return_value=mock_tide,
-            ):
-                with patch(
-                    "server.tools.tide_tools.tide_storage.add_flow_to_tide",
-                    return_value=mock_tide,
-                ):
-                    result = await end_tide_handler(args)
-
-        assert result["success"] is True
-        assert result["tide_id"] == "tide_123"
-        assert result["final_status"] == "completed"
-        assert "completed successfully" in result["summary"]
-
-    @pytest.mark.asyncio
-    async def test_end_tide_handler_not_found(self):
-        """Test ending non-existent tide"""
-        args = {"tide_id": "nonexistent", "status": "completed"}
-
-        with patch("server.tools.tide_tools.tide_storage.get_tide", return_value=None):
-            result = await end_tide_handler(args)
-
-        assert result["success"] is False
-        assert result["final_status"] == "not_found"
-        assert result["summary"] == "Tide not found"
+# Handlers only read their arguments, so tests share read-only views
+_CREATE_ARGS = MappingProxyType(
+    {"name": "Test Tide", "flow_type": "daily", "description": "A test tide"}
+)
+_FLOW_ARGS_BY_INTENSITY = {
+    intensity: MappingProxyType(
+        {"tide_id": "tide_123", "intensity": intensity, "duration": 25}
+    )
+    for intensity in ("gentle", "moderate", "strong")
+}
+_FLOW_ARGS_MODERATE = _FLOW_ARGS_BY_INTENSITY["moderate"]
+
+
+class FrozenDatetime(datetime):
+    """datetime whose now() always returns FROZEN_NOW"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return FROZEN_NOW
+
+
+@pytest.fixture(autouse=True, scope="module")
+def frozen_time():
+    """Freeze the clock used by the tool handlers for this module"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(tide_tools, "datetime", FrozenDatetime)
+        yield
+
+
+@pytest.mark.parametrize(
+    ("storage_error", "expected_success", "expected_id", "expected_next_flow"),
+    [
+        (None, True, "tide_123", "2024-01-02T00:00:00"),
+        (Exception("Storage error"), False, "", None),
+    ],
+    ids=["success", "storage_error"],
+)
+async def test_create_tide_handler(
+    storage_error: Exception | None,
+    expected_success: bool,
+    expected_id: str,
+    expected_next_flow: str | None,
+    tide_storage_mock: MagicMock,
+    mock_created_tide_123: TideData,
+):
+    """Test tide creation and its error handling"""
+    tide_storage_mock.create_tide.return_value = mock_created_tide_123
+    tide_storage_mock.create_tide.side_effect = storage_error
+
+    result = await create_tide_handler(_CREATE_ARGS)
+
+    expected = {
+        "success": expected_success,
+        "tide_id": expected_id,
+        "name": "Test Tide",
+        "flow_type": "daily",
+        "next_flow": expected_next_flow,
+    }
+    assert expected.items() <= result.items()
+
+
+@pytest.mark.parametrize(
+    ("args", "populated"),
+    [({"flow_type": "daily", "active_only": True}, True), ({}, False)],
+    ids=["success", "empty"],
+)
+async def test_list_tides_handler(
+    args: dict,
+    populated: bool,
+    tide_storage_mock: MagicMock,
+    mock_tides: list[TideData],
+):
+    """Test listing tides, including when none exist"""
+    tides = mock_tides if populated else []
+    tide_storage_mock.list_tides.return_value = tides
+
+    result = await list_tides_handler(args)
+
+    assert [tide["name"] for tide in result["tides"]] == [tide.name for tide in tides]
+    assert result["total"] == len(tides)
+
+
+async def test_flow_tide_handler_success(
+    tide_storage_mock: MagicMock, mock_tide_123: TideData
+):
+    """Test successful flow session start"""
+    tide_storage_mock.get_tide.return_value = mock_tide_123
+    tide_storage_mock.add_flow_to_tide.return_value = mock_tide_123
+
+    result = await flow_tide_handler(_FLOW_ARGS_MODERATE)
+
+    expected = {
+        "success": True,
+        "tide_id": "tide_123",
+        "flow_started": "2024-01-01T00:00:00",
+        "estimated_completion": "2024-01-01T00:25:00",
+    }
+    assert expected.items() <= result.items()
+    assert "focused attention" in result["flow_guidance"].lower()
+    assert len(result["next_actions"]) > 0
+
+
+async def test_flow_tide_handler_not_found(tide_storage_mock: MagicMock):
+    """Test flow session with non-existent tide"""
+    tide_storage_mock.get_tide.return_value = None
+
+    result = await flow_tide_handler(_FLOW_ARGS_MODERATE)
+
+    expected = {"success": False, "flow_guidance": "Tide not found", "next_actions": []}
+    assert expected.items() <= result.items()
+
+
+@pytest.mark.parametrize(
+    ("intensity", "args"),
+    list(_FLOW_ARGS_BY_INTENSITY.items()),
+    ids=list(_FLOW_ARGS_BY_INTENSITY),
+)
+async def test_flow_tide_handler_different_intensities(
+    intensity: str,
+    args: MappingProxyType,
+    tide_storage_mock: MagicMock,
+    mock_tide_123: TideData,
+):
+    """Test flow session with different intensities"""
+    tide_storage_mock.get_tide.return_value = mock_tide_123
+    tide_storage_mock.add_flow_to_tide.return_value = mock_tide_123
+
+    result = await flow_tide_handler(args)
+
+    assert result["success"] is True
+    assert result["flow_guidance"] == tide_tools.GUIDANCE_MAP[intensity]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"name": "Test", "flow_type": "daily"},
+        {"name": "Test", "flow_type": "weekly", "description": "A weekly tide"},
+    ],
+)
+def test_create_schema_valid(kwargs: dict):
+    """Test inputs accepted by the create tide schema"""
+    CreateTideInputSchema(**kwargs)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"name": "Test", "flow_type": "invalid"},
+        {"flow_type": "daily"},
+    ],
+    ids=["invalid_flow_type", "missing_name"],
+)
+def test_create_schema_invalid(kwargs: dict):
+    """Test inputs rejected by the create tide schema"""
+    with pytest.raises(ValueError):
+        CreateTideInputSchema(**kwargs)
+
+
+@pytest.mark.parametrize(
+    ("schema", "kwargs", "defaults"),
+    [
+        (ListTidesInputSchema, {}, {"flow_type": None, "active_only": None}),
+        (
+            FlowTideInputSchema,
+            {"tide_id": "test_id"},
+            {"intensity": "moderate", "duration": 25},
+        ),
+        (
+            EndTideInputSchema,
+            {"tide_id": "test_123"},
+            {"status": "completed", "notes": None},
+        ),
+    ],
+    ids=["list_tides", "flow_tide", "end_tide"],
+)
+def test_schema_defaults(schema: type[BaseModel], kwargs: dict, defaults: dict):
+    """Test defaults filled in for optional schema fields"""
+    validated = schema(**kwargs)
+
+    assert validated.model_dump(include=set(defaults)) == defaults
+
+
+async def test_end_tide_handler_success(
+    tide_storage_mock: MagicMock, mock_tide_123: TideData
+):
+    """Test successful tide completion"""
+    args = {"tide_id": "tide_123", "status": "completed", "notes": "Great session!"}
+    tide_storage_mock.get_tide.return_value = mock_tide_123
+    tide_storage_mock.apply_updates.return_value = mock_tide_123
+
+    result = await end_tide_handler(args)
+
+    expected = {"success": True, "tide_id": "tide_123", "final_status": "completed"}
+    assert expected.items() <= result.items()
+    assert "completed successfully" in result["summary"]
+
+    # Status and completion notes are saved together
+    tide_storage_mock.apply_updates.assert_awaited_once()
+    call = tide_storage_mock.apply_updates.await_args
+    assert call.args[1]["status"] == "completed"
+    assert call.kwargs["last_flow_notes"] == "Great session!"
+
+
+async def test_end_tide_handler_not_found(tide_storage_mock: MagicMock):
+    """Test ending non-existent tide"""
+    args = {"tide_id": "nonexistent", "status": "completed"}
+    tide_storage_mock.get_tide.return_value = None
+
+    result = await end_tide_handler(args)
+
+    expected = {
+        "success": False,
+        "final_status": "not_found",
+        "summary": "Tide not found",
+    }
+    assert expected.items() <= result.items()
+
+
+async def test_end_tide_handler_already_ended_skips_read(
+    tide_storage_mock: MagicMock, mock_tide_123: TideData
+):
+    """Test that a tide known to have ended is rejected without a disk read"""
+    args = {"tide_id": "tide_123", "status": "completed"}
+    tide_storage_mock.peek_tide.return_value = mock_tide_123.model_copy(
+        update={"status": "paused"}
+    )
+
+    result = await end_tide_handler(args)
+
+    tide_storage_mock.get_tide.assert_not_awaited()
+    expected = {
+        "success": False,
+        "final_status": "paused",
+        "summary": "Tide is already paused",
+    }
+    assert expected.items() <= result.items()